@@ -41,16 +41,92 @@
 
 ## Package imports
 import os
+import sys
 import glob
+import heapq
 import platform
 import datetime as dt
 import re
-import csv
+import json
+import mmap
 import numpy as np
-from scipy import stats
+import numba as nb
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_pdf import PdfPages
+# Hyperscan compiles both Action regexes into one linear-time DFA, which
+# scans each character exactly once and can't backtrack; it's optional,
+# and we fall back to the compiled re patterns when it isn't installed
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+## Module functions
+@nb.njit(cache=True, fastmath=True)
+def _lin_r2(x, y):
+# Closed-form ordinary least squares on two float64 arrays
+# Returns (slope, intercept, R^2) from sums over the mean-centered data;
+# much faster than scipy.stats.linregress for the short arrays we fit here
+    n = x.size
+    if n < 2:
+        return np.nan, np.nan, np.nan
+    # Center both variables about their means before accumulating. The
+    # raw-moment form (n*sxx - sx*sx) cancels catastrophically when x is
+    # Unix epoch seconds (~1.4e9) spanning only ~100 s; centered sums
+    # keep full precision
+    xMean = 0.0
+    yMean = 0.0
+    for i in range(n):
+        xMean += x[i]
+        yMean += y[i]
+    xMean /= n
+    yMean /= n
+    sxx = 0.0
+    syy = 0.0
+    sxy = 0.0
+    for i in range(n):
+        dx = x[i] - xMean
+        dy = y[i] - yMean
+        sxx += dx * dx
+        syy += dy * dy
+        sxy += dx * dy
+    # Degenerate x (all samples at one time) has no defined slope
+    if sxx == 0.0:
+        return np.nan, np.nan, np.nan
+    slope = sxy / sxx
+    intercept = yMean - slope * xMean
+    # R^2 correlation coefficient (square of Pearson's r); constant y
+    # means no variance to explain
+    if syy == 0.0:
+        r2 = 0.0
+    else:
+        # Clamp to 1; fastmath rounding can push a perfect fit a few ulp
+        # over, and linregress never reported r outside [-1, 1]
+        r2 = min((sxy * sxy) / (sxx * syy), 1.0)
+    return slope, intercept, r2
+
+@nb.njit(cache=True, fastmath=True, parallel=True)
+def _all_fits(x, Y, startIdx, endIdx):
+# Fit every (interval, label) regression in one parallel kernel
+# x is the full epoch vector, Y the matching (n, labels) value matrix, and
+# startIdx/endIdx the row bounds of each interval; intervals are
+# independent, so prange spreads them across cores
+    nIntervals = startIdx.size
+    nLabels = Y.shape[1]
+    slopes = np.empty((nIntervals, nLabels))
+    intercepts = np.empty((nIntervals, nLabels))
+    r2s = np.empty((nIntervals, nLabels))
+    for k in nb.prange(nIntervals):
+        i0 = startIdx[k]
+        i1 = endIdx[k]
+        for c in range(nLabels):
+            slope, intercept, r2 = _lin_r2(x[i0:i1], Y[i0:i1, c])
+            slopes[k, c] = slope
+            intercepts[k, c] = intercept
+            r2s[k, c] = r2
+    return slopes, intercepts, r2s
 
 ## Class definition
 class Fluxfit(object):
@@ -95,6 +171,21 @@ class Fluxfit(object):
     # Class initializer
         self.log_path = log_path
         self.output_path = output_path
+        # Parsed measurement log, cached so pull_fluxes and write_graphs
+        # don't each re-read and re-parse the CSV
+        self._log_cache = None
+        # First/last timestamp cache for the .dat files, persisted on disk
+        # and keyed by (mtime, size) so unchanged files are never reopened
+        self._ts_cache = None
+        # Day-directory listings keyed by (year, month, day); most
+        # intervals share a day, so glob each directory only once per run
+        self._dir_cache = {}
+        # Compiled Hyperscan database for the Action patterns (if the
+        # hyperscan module is available)
+        self._hs_db = None
+        # Fit results keyed by (start time, label) so write_graphs can
+        # plot what pull_fluxes already computed without refitting
+        self._fit_cache = {}
     
     # Boolean from checking if the filepath is valid
     def is_valid_filepath(self, filepath):
@@ -104,10 +195,14 @@ class Fluxfit(object):
             print("***ERROR*** {}".format(e))
     
     def load_log(self):
+        # Reuse the cached parse if we already have one
+        if self._log_cache is not None:
+            return self._log_cache
         if self.is_valid_filepath(self.log_path):
             try:
                 log_df = pd.read_csv(self.log_path, header=0)
                 log_df = log_df.set_index("Unix stamp")
+                self._log_cache = log_df
                 return log_df
             except:
                 raise RuntimeError(self.log_path + " exists but did not parse " +
@@ -117,22 +212,46 @@ class Fluxfit(object):
             raise FileNotFoundError(self.log_path + " is an invalid filepath." + 
                 " Check for typos and try again.")
     
+    def scan_actions(self, actions):
+    # Boolean begin/end masks over the Action column
+        if hyperscan is not None:
+            # Compile both patterns into one database the first time; a
+            # match reports id 0 (begin) or 1 (end)
+            if self._hs_db is None:
+                self._hs_db = hyperscan.Database()
+                self._hs_db.compile(
+                    expressions=[self.beginRead.encode(),
+                        self.endRead.encode()],
+                    ids=[0, 1],
+                    flags=[hyperscan.HS_FLAG_CASELESS] * 2)
+            maskBegin = np.zeros(len(actions), dtype=bool)
+            maskEnd = np.zeros(len(actions), dtype=bool)
+            masks = (maskBegin, maskEnd)
+            for row, action in enumerate(actions.values):
+                def on_match(matchId, start, end, flags, ctx, row=row):
+                    masks[matchId][row] = True
+                self._hs_db.scan(str(action).encode(),
+                    match_event_handler=on_match)
+            return maskBegin, maskEnd
+        # Fallback: compile the patterns once; passing a compiled pattern
+        # means pandas doesn't re-compile it for every element
+        maskBegin = actions.str.contains(
+            re.compile(self.beginRead, re.IGNORECASE), regex=True)
+        maskEnd = actions.str.contains(
+            re.compile(self.endRead, re.IGNORECASE), regex=True)
+        return maskBegin, maskEnd
+
     def zippedStartEnd(self, log):
     # Zip together start and end times found in the Action field of the log
-        # Get list of start times (defined by regex in beginRead)
-        startList = list(log[log["Action"].str.contains(
-            self.beginRead, re.IGNORECASE)].index)
-        # Get list of end times (defined by regex in endRead)
-        endList = list(log[log["Action"].str.contains(
-            self.endRead, re.IGNORECASE)].index)
+        maskBegin, maskEnd = self.scan_actions(log["Action"])
         # What if the start and end times don't match? Invoke as an error.
-        if len(startList) != len(endList):
+        if maskBegin.sum() != maskEnd.sum():
             raise RuntimeError("Action column mismatch. Number of start " +
                 "times parsed: {}\tNumber of end times parsed: {}".format(
-                    len(startList), len(endList)))
+                    maskBegin.sum(), maskEnd.sum()))
         else:
-            # Now zip them together
-            zipStEndTimes = zip(startList, endList)
+            # Now zip them together; return a list so callers can reuse it
+            zipStEndTimes = list(zip(log.index[maskBegin], log.index[maskEnd]))
             return zipStEndTimes
         
     def which_separator(self):
@@ -146,59 +265,99 @@ class Fluxfit(object):
     def file_list(self, startTime, endTime):
     # Get the list of files for the specified interval
         dirSep = self.which_separator()
-        # Container for file paths that have the data we need
-        targets = []
-        
+        # Per-day file listings covering the interval
+        dayLists = []
+
         stDate = dt.datetime.utcfromtimestamp(startTime)
         endDate = dt.datetime.utcfromtimestamp(endTime)
-        
-        # Get files associated with start and end dates
-        for i in [stDate, endDate]:
-            year = i.year
-            # zfill to add leading zeroes
-            month = str(i.month).zfill(2)
-            day = str(i.day).zfill(2)
-            # Where will we be looking for .dat files?
-            # data_path/year/month/day/*.dat
-            trailingPath = "{0}{1}{2}{1}{3}{1}*.dat".format(
-                year, dirSep, month, day)
-            globSearchPattern = self.data_path + trailingPath
-            # Add the paths which match the search pattern
-            targets.extend(glob.glob(globSearchPattern))
-        
-        # Remove duplicates using "set" and sort the list
-        targets = sorted(list(set(targets)))
-        # List comprehension to collect filepaths within interval
-        targets = [self.file_within_interval(f, startTime, endTime) for f in targets]
-        # Filter out 'None' values
-        targets = list(filter(None, targets))
-        # Return list of .dat files for the specified interval
-        return targets
+
+        # Get files associated with every date the interval touches,
+        # including the days between the start and end dates
+        nDays = (endDate.date() - stDate.date()).days
+        for i in [stDate + dt.timedelta(days=d) for d in range(nDays + 1)]:
+            key = (i.year, i.month, i.day)
+            if key not in self._dir_cache:
+                year = i.year
+                # zfill to add leading zeroes
+                month = str(i.month).zfill(2)
+                day = str(i.day).zfill(2)
+                # Where will we be looking for .dat files?
+                # data_path/year/month/day/*.dat
+                trailingPath = "{0}{1}{2}{1}{3}{1}*.dat".format(
+                    year, dirSep, month, day)
+                globSearchPattern = self.data_path + trailingPath
+                # Enumerate the day's directory once and keep it sorted
+                self._dir_cache[key] = sorted(glob.glob(globSearchPattern))
+            # Note the listing for this day
+            dayLists.append(self._dir_cache[key])
+
+        # The per-day listings are already sorted, so a linear merge keeps
+        # the order without re-sorting; drop consecutive duplicates (start
+        # and end falling on the same day) in the same style of pass
+        merged = list(heapq.merge(*dayLists))
+        targets = [f for i, f in enumerate(merged)
+            if i == 0 or f != merged[i - 1]]
+        # Return the .dat files within the interval in one filtering pass
+        # (file_within_interval gives back the path, or None to drop it)
+        return [f for f in targets
+            if self.file_within_interval(f, startTime, endTime)]
     
     def file_within_interval(self, filepath, startTime, endTime):
         firstStamp, lastStamp = self.file_timestamps(filepath)
         if startTime <= lastStamp and endTime >= firstStamp:
             return filepath
     
+    def ts_cache_path(self):
+    # Where the on-disk timestamp cache lives, alongside the data logs
+        return os.path.join(self.data_path, ".fluxfit_ts_cache.json")
+
+    def load_ts_cache(self):
+    # Load the persisted timestamp cache, or start a fresh one
+        if self._ts_cache is None:
+            try:
+                with open(self.ts_cache_path(), 'r') as f:
+                    self._ts_cache = json.load(f)
+            except (OSError, IOError, ValueError):
+                self._ts_cache = {}
+        return self._ts_cache
+
+    def save_ts_cache(self):
+    # Persist the timestamp cache so later runs skip unchanged files
+        if self._ts_cache is not None:
+            try:
+                with open(self.ts_cache_path(), 'w') as f:
+                    json.dump(self._ts_cache, f)
+            except (OSError, IOError) as e:
+                # Not being able to cache is not fatal, just slower next run
+                print("***WARNING*** could not save timestamp cache: "
+                    "{}".format(e))
+
     def file_timestamps(self, filepath):
     # Get the start and end timestamps of a measurement data log file
-        # Open in read-only binary mode
+        cache = self.load_ts_cache()
+        stat = os.stat(filepath)
+        cached = cache.get(filepath)
+        # Only trust the cached stamps if the file hasn't changed
+        if cached is not None and cached[0] == stat.st_mtime and \
+                cached[1] == stat.st_size:
+            return cached[2], cached[3]
+        # Memory-map the file read-only; finding the first and last data
+        # lines is then two C-level newline searches, no read syscalls
         with open(filepath, 'rb') as f:
-            # Ignore header
-            f.readline()
-            # Get first data line
-            firstLine = f.readline()
-            # Take EPOCH timestamp value (hard-coded, 6th item)
-            firstStamp = float(firstLine.decode().split()[5])
-            # Go to the second-to-last character
-            f.seek(-2, os.SEEK_END)
-            # Keep going backwards until the last line is reached
-            while f.read(1) != b'\n':
-                f.seek(-2, os.SEEK_CUR)
-            # Read the last line
-            lastLine = f.readline()
-            # Take EPOCH timestamp value (hard-coded, 6th item)
-            lastStamp = float(lastLine.decode().split()[5])
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # First data line sits between the 1st and 2nd newlines
+                # (the header ends at the 1st)
+                headerEnd = mm.find(b'\n')
+                firstLine = mm[headerEnd + 1:mm.find(b'\n', headerEnd + 1)]
+                # Take EPOCH timestamp value (hard-coded, 6th item)
+                firstStamp = float(firstLine.split()[5])
+                # Last line starts after the last newline before the
+                # (possibly trailing-newline) end of file
+                lastStart = mm.rfind(b'\n', 0, len(mm) - 1) + 1
+                lastLine = mm[lastStart:]
+                # Take EPOCH timestamp value (hard-coded, 6th item)
+                lastStamp = float(lastLine.split()[5])
+        cache[filepath] = (stat.st_mtime, stat.st_size, firstStamp, lastStamp)
         # Return the first and last timestamp values of the data log
         return firstStamp, lastStamp
     
@@ -215,36 +374,77 @@ class Fluxfit(object):
         return dt.datetime.strptime(fileDate, "%Y%m%d-%H%M%S")
         
     
+    def read_dat(self, dataPath):
+    # Parse one analyzer .dat file into a float array of the needed columns,
+    # EPOCH_TIME first
+        # The .dat format pads fields with runs of spaces, which rules out
+        # the single-character-delimiter readers (polars/pyarrow); pandas'
+        # C tokenizer handles whitespace runs and, restricted to 5 of ~40
+        # columns with a fixed dtype, parses at a fraction of the cost of
+        # np.loadtxt's Python-level row loop
+        # sep='\s+' is special-cased to whitespace splitting on the C
+        # engine and, unlike delim_whitespace, exists on every pandas
+        # version (delim_whitespace was removed in pandas 3.0)
+        wanted = ["EPOCH_TIME"] + self.getLabels
+        datadf = pd.read_csv(dataPath, sep=r'\s+', header=0,
+            usecols=wanted, dtype=np.float64)
+        # usecols keeps the file's column order; reorder to epoch-first
+        return datadf[wanted].to_numpy()
+
+    def grab_span(self, realStart, realEnd):
+    # All analyzer data overlapping the (already response-adjusted) span,
+    # as one float array sorted on EPOCH_TIME with NaN rows dropped
+        # Grab analyzer data files included in the span
+        dataFileList = self.file_list(realStart, realEnd)
+        # Read only the columns we need (5 of ~40) into per-file arrays
+        dataList = [self.read_dat(dataPath) for dataPath in dataFileList]
+        if len(dataList) == 1:
+            # Single file covers the interval; no copy needed at all
+            dataArr = dataList[0]
+        else:
+            # Fill one preallocated buffer row-range by row-range rather
+            # than letting concatenate build a second full-size copy
+            totalRows = sum(len(arr) for arr in dataList)
+            dataArr = np.empty((totalRows, 1 + len(self.getLabels)),
+                dtype=np.float64)
+            offset = 0
+            for arr in dataList:
+                dataArr[offset:offset + len(arr)] = arr
+                offset += len(arr)
+        # Drop NA/NAN values; that screws up the slicing!
+        dataArr = dataArr[~np.isnan(dataArr).any(axis=1)]
+        # Sort on EPOCH_TIME (first column) so the bounds can be found with
+        # a binary search instead of a linear nearest-index scan
+        dataArr = dataArr[np.argsort(dataArr[:, 0], kind='mergesort')]
+        return dataArr
+
+    def nearest_indices(self, epoch, targets):
+    # Row(s) of the sorted epoch vector nearest to the target time(s)
+        # searchsorted alone returns the insertion point, which always
+        # rounds up; step back wherever the left neighbor is closer, which
+        # restores the old get_loc(method='nearest') behavior at
+        # O(log n) cost
+        idx = np.searchsorted(epoch, targets)
+        idx = np.clip(idx, 1, len(epoch) - 1)
+        return np.where(np.abs(epoch[idx] - targets) <
+            np.abs(epoch[idx - 1] - targets), idx, idx - 1)
+
     def grab_data(self, startTime, endTime):
     # Get the data directly from the analyzer log files, return it as dataframe
-        # Adjust to real start and end time
-        realStartdt = startTime + self.responseTime
-        realEnddt = endTime + self.responseTime
-        # Grab analyzer data files included in the interval
-        dataFileList = self.file_list(realStartdt, realEnddt)
-        # Empty list to hold dataframes
-        dataList = []
-        for dataPath in dataFileList:
-            # Read in the .dat; last line is sometimes incomplete, handle error
-            datadf = pd.read_csv(
-                dataPath, header=0, delim_whitespace=True,
-                error_bad_lines=True)
-            # Set index on Unix time
-            datadf = datadf.set_index('EPOCH_TIME')
-            dataList.append(datadf)
-        # Concatenate the dataframes in the list
-        datadf = pd.concat(dataList)
-        # Drop NA/NAN values; that screws up the index slicing!
-        datadf = datadf.dropna()
-        # Get the index locations for measurement start and end
-        startIndex = datadf.index.get_loc(
-            (startTime + self.responseTime + self.startOffset),
-            method = 'nearest')
-        endIndex = datadf.index.get_loc(
-            (endTime + self.responseTime - self.endOffset),
-            method = 'nearest')
-        # Get the subset of the dataframe from start to end of measurement
-        subset = datadf.iloc[startIndex:endIndex]
+        # Adjust to real start and end time, then pull the covering span
+        dataArr = self.grab_span(startTime + self.responseTime,
+            endTime + self.responseTime)
+        epoch = dataArr[:, 0]
+        # Get the row locations for measurement start and end
+        startIndex = self.nearest_indices(epoch,
+            startTime + self.responseTime + self.startOffset)
+        endIndex = self.nearest_indices(epoch,
+            endTime + self.responseTime - self.endOffset)
+        # Build the dataframe only for the subset we keep, indexed on
+        # Unix time
+        subset = pd.DataFrame(dataArr[startIndex:endIndex, 1:],
+            index=pd.Index(epoch[startIndex:endIndex], name='EPOCH_TIME'),
+            columns=self.getLabels)
         return subset
     
     def pull_fluxes(self):
@@ -252,13 +452,57 @@ class Fluxfit(object):
     # To-do: overwrite option
         log = self.load_log()
         zipStEnd = self.zippedStartEnd(log)
-        
-        for stTime, endTime in zipStEnd:
-            # Get data frame for this interval
-            data = self.grab_data(stTime, endTime)
-            distance = data.index[-1] - data.index[0]
-            print("Getting fluxes for {0} to {1} ({2}s)".format(
-                data.index[0], data.index[-1], round(distance, 2)))
+        # Nothing to pull from an action-free log
+        if not zipStEnd:
+            return
+
+        # Load every file the run touches in one pass, then fit all
+        # interval x label regressions in a single parallel kernel instead
+        # of re-slicing and fitting interval by interval in Python
+        starts = np.array([st for st, end in zipStEnd], dtype=np.float64)
+        ends = np.array([end for st, end in zipStEnd], dtype=np.float64)
+        dataArr = self.grab_span(starts.min() + self.responseTime,
+            ends.max() + self.responseTime)
+        epoch = dataArr[:, 0]
+        Y = dataArr[:, 1:]
+        # No rows at all means no data files matched the whole span,
+        # usually a wrong data_path; say so before nearest_indices
+        # trips over the empty array
+        if epoch.size == 0:
+            raise RuntimeError(("No analyzer data found between {0} and "
+                "{1}. Check that data_path ({2}) points at the analyzer's "
+                "DataLog_User tree.").format(
+                    starts.min(), ends.max(), self.data_path))
+        # Row bounds of each interval within the shared epoch vector,
+        # rounded to the nearest sample like the per-interval path
+        startIdx = self.nearest_indices(epoch,
+            starts + self.responseTime + self.startOffset)
+        endIdx = self.nearest_indices(epoch,
+            ends + self.responseTime - self.endOffset)
+        # An empty interval means its data never made it into the span;
+        # fitting it would hand uninitialized output straight to the
+        # results file (errors don't propagate out of the prange kernel),
+        # so fail loudly here instead
+        empty = np.nonzero(endIdx <= startIdx)[0]
+        if len(empty) > 0:
+            k = empty[0]
+            raise RuntimeError(("No data found for measurement interval "
+                "{0} to {1}. Check that the data logs for that date are "
+                "present under {2}.").format(
+                    zipStEnd[k][0], zipStEnd[k][1], self.data_path))
+        slopes, intercepts, r2s = _all_fits(epoch, Y, startIdx, endIdx)
+
+        # Buffer the result rows and write them in one go at the end,
+        # instead of reopening the output file for every interval; same
+        # for the progress messages, so the hot loop never blocks on a
+        # line-buffered console flush
+        lines = []
+        msgs = []
+        for k, (stTime, endTime) in enumerate(zipStEnd):
+            i0 = startIdx[k]
+            i1 = endIdx[k]
+            msgs.append("Getting fluxes for {0} to {1} ({2}s)".format(
+                epoch[i0], epoch[i1 - 1], round(epoch[i1 - 1] - epoch[i0], 2)))
             # Line at the beginning of the current measurement
             first = log.loc[stTime]
             line = [stTime + self.responseTime,
@@ -266,45 +510,77 @@ class Fluxfit(object):
                 first["UTC Time"],
                 first["Group ID"],
                 first["Unique ID"]]
-            for label in self.getLabels:
-                fluxFrame = data[label]
-                slope, intercept, r_value = self.slope_int_Rval(fluxFrame)
-                line.extend([slope, r_value])
-            # Write line to file
-            self.write_flux(line)
+            for c, label in enumerate(self.getLabels):
+                line.extend([slopes[k, c], r2s[k, c]])
+                # Keep the data and fit around so write_graphs doesn't
+                # have to re-read or refit this interval
+                self._fit_cache[(stTime, label)] = (epoch[i0:i1],
+                    Y[i0:i1, c], slopes[k, c], intercepts[k, c], r2s[k, c])
+            lines.append(line)
+        # Report all the intervals with a single console write
+        if msgs:
+            sys.stdout.write('\n'.join(msgs) + '\n')
+        # Write all the flux lines to file at once
+        self.write_fluxes(lines)
+        # Persist the per-file timestamp cache for the next run
+        self.save_ts_cache()
 
     def slope_int_Rval (self, df):
-    # Slope and R value from a linear regression of the dataframe
-        slope, intercept, r_value, p_value, std_err = stats.linregress(
-            list(df.index),
-            list(df))
-        # r_value is Pearson's r, return R^2 correlation coefficient
-        return slope, intercept, r_value**2
+    # Slope, intercept, and R^2 from a linear regression of the dataframe
+        return _lin_r2(df.index.values.astype(np.float64),
+            df.values.astype(np.float64))
+
+    def slopes_int_Rvals(self, data):
+    # Regress every label in getLabels against the shared time index at once
+        # The x values are identical for every label, so compute their sums
+        # once and reduce the (n, labels) value matrix column-wise--one pass
+        # over memory instead of one per label
+        x = data.index.to_numpy(dtype=np.float64)
+        Y = data[self.getLabels].to_numpy(dtype=np.float64)
+        # Center about the means before reducing; the raw-moment form
+        # cancels catastrophically on epoch-seconds x (see _lin_r2)
+        xMean = x.mean()
+        yMeans = Y.mean(0)
+        xc = x - xMean
+        Yc = Y - yMeans
+        sxx = (xc * xc).sum()
+        # Column-wise sums; each is a vector with one entry per label
+        sxy = (xc[:, None] * Yc).sum(0)
+        syy = (Yc * Yc).sum(0)
+        # Mirror _lin_r2's degenerate-input handling: no slope is defined
+        # for fewer than two samples or constant x
+        if x.size < 2 or sxx == 0.0:
+            return (np.full(Y.shape[1], np.nan),
+                np.full(Y.shape[1], np.nan),
+                np.full(Y.shape[1], np.nan))
+        slopes = sxy / sxx
+        intercepts = yMeans - slopes * xMean
+        # Constant columns have no variance to explain, so R^2 is 0 there
+        # (dividing by 1 keeps the 0/0 warning from firing); clamp at 1
+        # like the scalar path
+        safeSyy = np.where(syy == 0.0, 1.0, syy)
+        r2s = np.where(syy == 0.0, 0.0,
+            np.minimum((sxy * sxy) / (sxx * safeSyy), 1.0))
+        return slopes, intercepts, r2s
     
-    def write_flux(self, line):
-    # Write the flux to the results file at output path
-        # Windows is stupid and needs to write text as a binary stream
-        if platform.system() == 'Windows':
-            modeAppend = 'b'
-        else:
-            modeAppend = ''
-        # Does the output file exist? If not, make a new one
-        if not self.is_valid_filepath(self.output_path):
-            with open(self.output_path, 'w'+modeAppend) as newfile:
-                writeLabels = ["Epoch",
-                            "UTC_Date",
-                            "UTC_Time",
-                            "GroupID",
-                            "UniqueID"]
-                # Columns to pull from the data; saved as a concentration rise
-                # rate (ppm/s) and correlation coefficient R^2
-                for label in self.getLabels:
-                    writeLabels.extend([label+"_ppm/s", label+"_R^2"])
-                make_header = csv.writer(newfile, dialect='excel')
-                make_header.writerow(writeLabels)
-        with open(self.output_path, 'a'+modeAppend) as file:
-            thisRow = csv.writer(file, dialect='excel')
-            thisRow.writerow(line)
+    def write_fluxes(self, lines):
+    # Write the flux lines to the results file at output path
+        writeLabels = ["Epoch",
+                    "UTC_Date",
+                    "UTC_Time",
+                    "GroupID",
+                    "UniqueID"]
+        # Columns pulled from the data; saved as a concentration rise
+        # rate (ppm/s) and correlation coefficient R^2
+        for label in self.getLabels:
+            writeLabels.extend([label+"_ppm/s", label+"_R^2"])
+        # Does the output file exist? If not, we start with a header row
+        newFile = not self.is_valid_filepath(self.output_path)
+        # to_csv formats the floats in C and writes the whole batch in one
+        # buffered pass, rather than csv.writer's per-field Python round trip
+        results = pd.DataFrame(lines, columns=writeLabels)
+        results.to_csv(self.output_path, index=False,
+            mode='w' if newFile else 'a', header=newFile)
     
     def write_graphs(self, graphOutputPath):
     # Save a PDF containing graphs of the measurement intervals at the specified
@@ -328,43 +604,57 @@ class Fluxfit(object):
         zipStEnd = self.zippedStartEnd(log)
         # Begin writing to the PDF via matplotlib's PDF backend
         with PdfPages(graphOutputPath) as pdf:
+            # Build one figure with the data and fit line artists up
+            # front; every graph below only swaps their data and the
+            # title, instead of allocating (and tearing down) a fresh
+            # figure, axes, and canvas per measurement. Using Figure
+            # directly also keeps us out of pyplot's global state.
+            fig = Figure(figsize=(figureW, figureH))
+            ax = fig.add_subplot(111)
+            dataLine, = ax.plot([], [], linewidth=linWid)
+            fitLine, = ax.plot([], [], color='black', linewidth=linWid/2)
+            # Axis labels are the same for every graph
+            ax.set_xlabel("time (s)")
+            ax.set_ylabel("concentration (ppm)")
             # Go through each start and end interval
             for start_t, end_t in zipStEnd:
-                # Load the data interval
-                data = self.grab_data(start_t, end_t)
-                distance = data.index[-1] - data.index[0]
+                # Reuse the fits cached by pull_fluxes; only load and fit
+                # the interval ourselves on a miss, so write_graphs still
+                # works standalone
+                if (start_t, self.getLabels[0]) not in self._fit_cache:
+                    data = self.grab_data(start_t, end_t)
+                    slopes, intercepts, r2s = self.slopes_int_Rvals(data)
+                    epoch = data.index.to_numpy(dtype=np.float64)
+                    for c, label in enumerate(self.getLabels):
+                        self._fit_cache[(start_t, label)] = (epoch,
+                            data[label].to_numpy(dtype=np.float64),
+                            slopes[c], intercepts[c], r2s[c])
+                intEpoch = self._fit_cache[(start_t, self.getLabels[0])][0]
+                distance = intEpoch[-1] - intEpoch[0]
                 print("Graphing inverval from {0} to {1} ({2}s)".format(
-                    data.index[0], data.index[-1], round(distance, 2)))
+                    intEpoch[0], intEpoch[-1], round(distance, 2)))
                 for label in self.getLabels:
-                    # Initialize a plot figure (width, height)
-                    fig = plt.figure(figsize=(figureW, figureH))
+                    epoch, y_values, slope, intercept, r_value = \
+                        self._fit_cache[(start_t, label)]
                     # Prepare title with identifying information
                     titleText = "{0}: {1}, {2}, {3}".format(
                         start_t, # Start time
                         log["Group ID"].loc[start_t], # Group ID
                         log["Unique ID"].loc[start_t], # Individual ID
                         label) # Label
-                    # Give title and axis labels
-                    plt.title(titleText)
-                    plt.xlabel("time (s)")
-                    plt.ylabel("concentration (ppm)")
+                    ax.set_title(titleText)
                     # Shift graph to 0-index
-                    x_coords = np.asarray(data.index) - start_t - \
+                    x_coords = epoch - start_t - \
                         self.startOffset - self.responseTime
-                    # Get fit line parameters
-                    # slope, intercept, r_value = self.slope_int_Rval(data[label])
-                    # Write the graph to the figure
-                    plt.plot(x_coords,
-                        np.asarray(data[label]),
-                        linewidth=linWid)
-                    # Add the fit line
-                    slope, intercept, r_value = self.slope_int_Rval(data[label])
-                    plt.plot(x_coords,
-                        slope*data.index + intercept, # m*x + b format
-                        color='black', linewidth=linWid/2)
+                    # Swap the measurement data into the figure
+                    dataLine.set_data(x_coords, y_values)
+                    # And the fit line
+                    fitLine.set_data(x_coords,
+                        slope*epoch + intercept) # m*x + b format
+                    # Rescale the axes to the new data
+                    ax.relim()
+                    ax.autoscale_view()
                     # Use tight layout margins and spacing
                     fig.tight_layout()
                     # Save figure to PDF
                     pdf.savefig(fig)
-                    # Close the figure
-                    plt.close()
@@ -83,15 +83,19 @@ class Picolog(object):
                     self.filepath))
     
     # Print out the last line of log file
-    # This will take a long time if the log file is large
+    # Only the last 4 KiB are read, so file size doesn't matter
     def tail(self):
         try:
-            # Read through the file line-by-line until the end
-            with open(self.filepath, 'r') as file:
-                for line in file:
-                    pass
-                # Print last line as tab-delimited without the newline character
-                print(line[:-1].replace(',', '\t'))
+            # Seek to near the end and read just the final block
+            with open(self.filepath, 'rb') as file:
+                file.seek(0, os.SEEK_END)
+                size = file.tell()
+                file.seek(max(0, size - 4096))
+                # splitlines drops a trailing newline, so the last entry
+                # is the last line
+                line = file.read().splitlines()[-1].decode()
+                # Print last line as tab-delimited
+                print(line.replace(',', '\t'))
         except Exception as e:
             print("ERROR: {}".format(e))
 
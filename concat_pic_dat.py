@@ -3,8 +3,9 @@
 
 import os
 import glob
+import shutil
 
-myPath = "C:\UserData\DataLog_User\2015\09\28"
+myPath = r"C:\UserData\DataLog_User\2015\09\28"
 
 for root, dirs, files in os.walk(myPath):
     print("Root: {}\tDirs: {}\tFiles:{}".format(root, dirs, files))
@@ -17,16 +18,18 @@ for root, dirs, files in os.walk(myPath):
             if datFile.endswith('User.dat'): # Yes, it is an original .dat file
                 print("Processing {}".format(datFile))
                 # Let's now open a file in the form "MM-DD_conc.dat"
+                # Binary mode on both ends skips newline translation
                 with open("{0}/{1}-{2}_conc.dat".format(root,
                                                         root[-5:-3],
-                                                        root[-2:]), 'a') as fileOut:
-                    with open(root+'/'+datFile, 'r') as readDat:
-                        if headerWritten:
-                            readDat.readline() # Skip header
-                        else:
+                                                        root[-2:]), 'ab') as fileOut:
+                    with open(root+'/'+datFile, 'rb') as readDat:
+                        firstLine = readDat.readline()
+                        if not headerWritten:
+                            fileOut.write(firstLine) # Keep the first header
                             headerWritten = True
-                        for line in readDat:
-                            fileOut.write(line)
+                        # Blit the rest of the file in 1 MiB blocks at C
+                        # speed instead of looping over lines in Python
+                        shutil.copyfileobj(readDat, fileOut, 1024*1024)
                 print("Completed processing {}".format(datFile))
         print("Moving to next directory")
                     
\ No newline at end of file